@@ -4,8 +4,16 @@ import random
 import os
 import edge_tts
 import asyncio
+import io
 import re
 from dotenv import load_dotenv
+from whisper_gen import load_model, transcribe, save_timestamps
+
+# patterns used by the cleanup below, compiled once
+_WS = re.compile(r"\s+")
+_CC = re.compile(r",\s*,+")
+_DOT = re.compile(r"\.{4,}")
+_TRANS = str.maketrans({";": ",", ":": ","})
 
 # ---------------------------
 # LOAD ENV
@@ -70,20 +78,17 @@ script = response.text.strip()
 script = re.sub(r"\*+", "", script)
 script = re.sub(r"\[.*?\]", "", script)
 script = re.sub(r"\(.*?\)", "", script)
-script = re.sub(r"\s+", " ", script).strip()
+script = _WS.sub(" ", script).strip()
 
 # ---------------------------
 # HUMANIZE FOR TTS
 # ---------------------------
 
 def humanize_for_tts(text: str) -> str:
-    cleaned = re.sub(r"\s+", " ", text).strip()
-    cleaned = cleaned.replace(";", ",")
-    cleaned = cleaned.replace(":", ",")
-    cleaned = cleaned.replace(" - ", ", ")
-    cleaned = cleaned.replace(" -- ", ", ")
-    cleaned = re.sub(r",\s*,+", ", ", cleaned)
-    cleaned = re.sub(r"\.{4,}", "...", cleaned)
+    cleaned = _WS.sub(" ", text).strip().translate(_TRANS)
+    cleaned = cleaned.replace(" - ", ", ").replace(" -- ", ", ")
+    cleaned = _CC.sub(", ", cleaned)
+    cleaned = _DOT.sub("...", cleaned)
 
     if "." in cleaned:
         first, rest = cleaned.split(".", 1)
@@ -108,8 +113,31 @@ async def generate_voice(text):
         rate="+10%",
         pitch="+2Hz",
     )
-    await communicate.save("voice.mp3")
 
-asyncio.run(generate_voice(script))
+    # write chunks as they arrive and keep a copy in memory for whisper
+    audio = io.BytesIO()
+    with open("voice.mp3", "wb") as f:
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                f.write(chunk["data"])
+                audio.write(chunk["data"])
+
+    audio.seek(0)
+    return audio
+
+# ---------------------------
+# TIMESTAMPS
+# ---------------------------
+
+async def voice_and_timestamps(text):
+    # load whisper on a thread while the TTS audio is still streaming in
+    model, audio = await asyncio.gather(
+        asyncio.to_thread(load_model),
+        generate_voice(text)
+    )
+    print("\n✅ voice.mp3 ready")
+
+    words = await asyncio.to_thread(transcribe, model, audio)
+    save_timestamps(words)
 
-print("\n✅ voice.mp3 ready")
+asyncio.run(voice_and_timestamps(script))
@@ -1,7 +1,9 @@
-import requests
+import aiohttp
+import asyncio
 import os
 from dotenv import load_dotenv
 import base64
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 load_dotenv()
 
@@ -19,34 +21,98 @@ headers = {
     "Content-Type": "application/json"
 }
 
-data = {
-    "model": "stabilityai/sdxl",
-    "messages": [
-        {
-            "role": "user",
-            "content": prompt
-        }
-    ]
-}
-
-print("Generating image...")
-
-r = requests.post(url, headers=headers, json=data)
-
-print("Status:", r.status_code)
-
-if r.status_code != 200:
-    print(r.text)
-    raise SystemExit("Request failed")
-
-result = r.json()
-
-# Extract base64 image
-img_b64 = result["choices"][0]["message"]["images"][0]["b64_json"]
-
-img_bytes = base64.b64decode(img_b64)
-
-with open("test.png", "wb") as f:
-    f.write(img_bytes)
-
-print("✅ Image saved as test.png")
+# ---------------------------
+# HTTP SESSION
+# ---------------------------
+
+# one pooled session, so several images reuse the same TLS connections
+_SESSION = None
+
+async def _get_session():
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = aiohttp.ClientSession(
+            headers=headers,
+            connector=aiohttp.TCPConnector(limit_per_host=64)
+        )
+    return _SESSION
+
+async def close_session():
+    global _SESSION
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+
+# ---------------------------
+# RETRIES
+# ---------------------------
+
+# rate limits and server hiccups are worth another try, bad requests are not
+def _is_retryable(exc):
+    return isinstance(exc, aiohttp.ClientResponseError) and exc.status in (429, 500, 502, 503)
+
+_backoff = wait_exponential(multiplier=1, max=30)
+
+# wait as long as the server asks to on 429, else back off exponentially
+def _wait(retry_state):
+    exc = retry_state.outcome.exception()
+    retry_after = (exc.headers or {}).get("Retry-After") if exc else None
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), 60)
+    return _backoff(retry_state)
+
+# ---------------------------
+# GENERATE IMAGE
+# ---------------------------
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=_wait,
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+async def generate_image(prompt):
+    data = {
+        "model": "stabilityai/sdxl",
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    }
+
+    session = await _get_session()
+
+    async with session.post(url, json=data) as r:
+        print("Status:", r.status)
+
+        if not r.ok:
+            # error pages can be big html, the start is enough to log
+            print((await r.content.read(2048)).decode("utf-8","replace"))
+        r.raise_for_status()
+
+        result = await r.json()
+
+    # Extract base64 image
+    img_b64 = result["choices"][0]["message"]["images"][0]["b64_json"]
+
+    return base64.b64decode(img_b64)
+
+async def main():
+    print("Generating image...")
+
+    try:
+        img_bytes = await generate_image(prompt)
+    except aiohttp.ClientResponseError:
+        raise SystemExit("Request failed")
+    finally:
+        await close_session()
+
+    with open("test.png", "wb") as f:
+        f.write(img_bytes)
+
+    print("✅ Image saved as test.png")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,79 @@
-from moviepy.editor import *
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
 import numpy as np
-import re
+import subprocess
+import tempfile
 import os
 import random
 
+# -----------------------
+# ENCODER
+# -----------------------
+
+USE_GPU = True  # encode on NVENC / AMF when the machine has one
+DRAFT = False   # quick preview render: fastest presets, bigger file
+
+@lru_cache(maxsize=None)
+def _hw_encoder():
+    ffmpeg = get_setting("FFMPEG_BINARY")
+    try:
+        listed = subprocess.run(
+            [ffmpeg,"-hide_banner","-encoders"],
+            capture_output=True,text=True
+        ).stdout
+    except OSError:
+        return None
+
+    for encoder in ("h264_nvenc","hevc_amf"):
+        if encoder not in listed:
+            continue
+        # ffmpeg builds list these even without the hardware, so try one frame
+        probe = subprocess.run(
+            [ffmpeg,"-hide_banner","-loglevel","error",
+             "-f","lavfi","-i","color=black:s=256x256",
+             "-frames:v","1","-c:v",encoder,"-f","null","-"],
+            capture_output=True
+        )
+        if probe.returncode == 0:
+            return encoder
+
+    return None
+
+def _encoder_params(use_gpu,draft=False):
+    encoder = _hw_encoder() if use_gpu else None
+
+    # hardware encoders reject x264 preset names like "medium"
+    if encoder == "h264_nvenc":
+        return dict(
+            codec="h264_nvenc",
+            preset="p1" if draft else "p5",
+            ffmpeg_params=["-tune","hq","-rc","vbr","-cq","23","-b:v","8M","-pix_fmt","yuv420p"]
+        )
+    if encoder == "hevc_amf":
+        quality = "speed" if draft else "quality"
+        return dict(
+            codec="hevc_amf",
+            preset=quality,
+            ffmpeg_params=["-quality",quality,"-pix_fmt","yuv420p"]
+        )
+    # "slow" was the biggest wall-time knob for very little quality over "medium";
+    # ffmpeg already runs libx264 on every core (threads=auto)
+    return dict(codec="libx264",preset="ultrafast" if draft else "medium",ffmpeg_params=None)
+
+def _encoder_args(use_gpu,draft=False):
+    params = _encoder_params(use_gpu,draft)
+    args = ["-c:v",params["codec"],"-preset",params["preset"]]
+    return args + (params["ffmpeg_params"] or ["-pix_fmt","yuv420p"])
+
+# -----------------------
+# DECODER
+# -----------------------
+
+# NVDEC only exists alongside NVENC
+NVDEC_ARGS = ["-hwaccel","cuda"] if USE_GPU and _hw_encoder() == "h264_nvenc" else []
+
 # -----------------------
 # PICK RANDOM VIDEO
 # -----------------------
@@ -23,33 +92,20 @@ if not videos:
 chosen_video = random.choice(videos)
 print("Using video:", chosen_video)
 
-video = VideoFileClip(chosen_video)
-
 # Target Reel size
 TARGET_W = 720
 TARGET_H = 1280
-
-# Scale just enough
-scale = max(TARGET_W/video.w, TARGET_H/video.h)
-video = video.resize(scale)
-
-# Then crop center
-video = video.crop(
-    x_center=video.w/2,
-    y_center=video.h/2,
-    width=TARGET_W,
-    height=TARGET_H
-)
-
+FPS = 30
 
 # -----------------------
 # LOAD AUDIO
 # -----------------------
 
-audio = AudioFileClip("voice.mp3")
+audio_duration = ffmpeg_parse_infos("voice.mp3")["duration"]
 
-# Loop video to match audio
-video = video.loop(duration=audio.duration).set_audio(audio)
+# only loop a clip that is shorter than the voice, -t trims the rest
+video_duration = ffmpeg_parse_infos(chosen_video)["duration"]
+LOOP_ARGS = ["-stream_loop","-1"] if video_duration < audio_duration else []
 
 # -----------------------
 # COLOR RULES
@@ -60,8 +116,10 @@ danger_words = {
     "risk","scary","fear","dead"
 }
 
+_DIGITS = frozenset("0123456789")
+
 def get_color(word):
-    if re.search(r"\d", word):
+    if not _DIGITS.isdisjoint(word):
         return "#4CFF00"
     if word.lower() in danger_words:
         return "#FF3B3B"
@@ -71,12 +129,19 @@ def get_color(word):
 # TEXT IMAGE
 # -----------------------
 
+@lru_cache(maxsize=4)
+def _load_font(size):
+    return ImageFont.truetype("C:/Windows/Fonts/arialbd.ttf",size)
+
+# the same words ("THE", "OF", numbers) come back all the time,
+# so each distinct word is rendered once and the array is shared
+@lru_cache(maxsize=256)
 def text_img(text):
     W,H = 520,150
     img = Image.new("RGBA",(W,H),(0,0,0,0))
     draw = ImageDraw.Draw(img)
 
-    font = ImageFont.truetype("C:/Windows/Fonts/arialbd.ttf",52)
+    font = _load_font(52)
 
     color = get_color(text)
 
@@ -93,61 +158,133 @@ def text_img(text):
     x=(W-w)//2
     y=(H-h)//2
 
-    # outline
-    for dx in range(-3,4):
-        for dy in range(-3,4):
-            draw.text((x+dx,y+dy),text,font=font,fill="black")
-
-    draw.text((x,y),text,font=font,fill=color)
+    # text with a 3px black outline in one pass
+    draw.text(
+        (x,y),text,font=font,fill=color,
+        stroke_width=3,stroke_fill=(0,0,0,255)
+    )
 
-    return np.array(img)
+    # one copy out of PIL; frombuffer over bytes is read-only, which
+    # keeps the cached array safe to share between captions
+    return np.frombuffer(img.tobytes("raw","RGBA"),dtype=np.uint8).reshape(H,W,4)
 
 # -----------------------
-# WORD CLIP
+# CAPTION GRAPH
 # -----------------------
 
-def word_clip(word,start,end):
-    img = text_img(word.upper())
-    dur = end-start
-
-    return (
-        ImageClip(img)
-        .set_start(start)
-        .set_duration(dur)
-        .set_position(("center",0.75), relative=True)  # lower captions
-        .resize(lambda t: 1 + 0.25*np.exp(-5*t))
-        .fadein(0.05)
-        .fadeout(0.05)
-    )
+CAPTION_Y = int(0.75*TARGET_H)  # lower captions
+FADE = 0.05
+
+# Every distinct word is one PNG input. ffmpeg splits it per use, holds
+# it for the word's frames and does the pop (1+0.25*exp(-5t)) and the
+# fades itself, so no caption frame is ever drawn in Python.
+def caption_graph(subs,png_dir,first_input):
+    uses = {}
+    for order,(first,frames,word) in enumerate(subs):
+        if frames > 0:
+            uses.setdefault(word,[]).append((order,first,frames))
+
+    inputs,filters,layers = [],[],[]
+
+    for idx,(word,spans) in enumerate(uses.items(),first_input):
+        path = os.path.join(png_dir,f"{idx}.png")
+        Image.fromarray(text_img(word)).save(path,compress_level=1)
+        inputs += ["-i",path]
+
+        copies = "".join(f"[w{idx}_{i}]" for i in range(len(spans)))
+        filters.append(f"[{idx}:v]split={len(spans)}{copies}")
+
+        for i,(order,first,frames) in enumerate(spans):
+            tag = f"{idx}_{i}"
+            filters += [
+                f"[w{tag}]loop=loop={frames-1}:size=1,settb=1/{FPS},setpts=N,"
+                f"format=rgba,split[rgb{tag}][a{tag}]",
+                # fade the colour to black like MoviePy, keep the mask
+                f"[a{tag}]alphaextract[m{tag}]",
+                f"[rgb{tag}]format=rgb24,fade=t=in:st=0:d={FADE},"
+                f"fade=t=out:st={max(0,frames/FPS-FADE):.3f}:d={FADE}[f{tag}]",
+                f"[f{tag}][m{tag}]alphamerge,"
+                f"scale=w='iw*(1+0.25*exp(-5*t))':h=-1:eval=frame,"
+                f"setpts=PTS+{first}[c{tag}]",
+            ]
+            layers.append((order,f"[c{tag}]"))
+
+    # later words on top, centered, clipped by the frame early in the pop
+    stream = "[bg]"
+    for n,(_,layer) in enumerate(sorted(layers)):
+        filters.append(
+            f"{stream}{layer}overlay=x=(main_w-overlay_w)/2:y={CAPTION_Y}"
+            f":eof_action=pass:format=auto[o{n}]"
+        )
+        stream = f"[o{n}]"
+
+    return inputs,filters,stream
 
 # -----------------------
 # LOAD TIMESTAMPS
 # -----------------------
 
-subs=[]
-
-with open("timestamps.txt",encoding="utf-8") as f:
-    lines = f.read().splitlines()
-
-for line in lines:
-    s,e,w = line.split("|")
-    subs.append(word_clip(w,float(s),float(e)))
+# whisper_gen writes the same data as arrays to timestamps.npz, but a
+# newer timestamps.txt (hand edited, or from another writer) wins
+def _npz_is_current():
+    if not os.path.exists("timestamps.npz"):
+        return False
+    if not os.path.exists("timestamps.txt"):
+        return True
+    return os.path.getmtime("timestamps.npz") >= os.path.getmtime("timestamps.txt")
+
+if _npz_is_current():
+    data = np.load("timestamps.npz")
+    starts,ends,words = data["starts"],data["ends"],data["words"]
+else:
+    with open("timestamps.txt",encoding="utf-8") as f:
+        rows = [line.split("|") for line in f.read().splitlines()]
+    starts = np.array([float(r[0]) for r in rows])
+    ends = np.array([float(r[1]) for r in rows])
+    words = np.array([r[2] for r in rows],dtype=str)
+
+# first output frame and frame count of every word, in one go
+first_frames = np.ceil(starts*FPS).astype(int)
+frame_counts = np.ceil(ends*FPS).astype(int)-first_frames
+
+subs = list(zip(first_frames.tolist(),frame_counts.tolist(),np.char.upper(words).tolist()))
 
 # -----------------------
 # FINAL
 # -----------------------
 
-final = CompositeVideoClip([video] + subs)
+encoder = _encoder_args(USE_GPU,DRAFT)
+print("Encoding with:", encoder[1])
 
-final.write_videofile(
-    "final_reel.mp4",
-    fps=30,
-    codec="libx264",
-    preset="slow",        # better compression quality
-    bitrate="8000k",      # big quality boost
-    audio_codec="aac",
-    audio_bitrate="192k"
-)
+with tempfile.TemporaryDirectory() as tmp:
+    caption_inputs,caption_filters,video_out = caption_graph(subs,tmp,2)
+
+    # scale just enough and crop center, then the captions go on top
+    background = (
+        f"[0:v]scale={TARGET_W}:{TARGET_H}:force_original_aspect_ratio=increase,"
+        f"crop={TARGET_W}:{TARGET_H},setsar=1,fps={FPS}[bg]"
+    )
 
+    # a script file, a long reel is too much for the Windows command line
+    graph = os.path.join(tmp,"graph.txt")
+    with open(graph,"w",encoding="utf-8") as f:
+        f.write(";\n".join([background]+caption_filters))
+
+    cmd = [
+        get_setting("FFMPEG_BINARY"),"-y","-loglevel","error",
+        *NVDEC_ARGS,*LOOP_ARGS,"-i",chosen_video,
+        "-i","voice.mp3",
+        *caption_inputs,
+        "-filter_complex_script",graph,
+        "-map",video_out,"-map","1:a",
+        *encoder,
+        "-b:v","8000k",       # big quality boost
+        "-c:a","aac","-b:a","192k",
+        "-t",f"{audio_duration:.3f}",
+        "final_reel.mp4"
+    ]
+
+    if subprocess.run(cmd).returncode != 0:
+        raise SystemExit("ffmpeg failed to render the reel")
 
 print("\n✅ Reel created: final_reel.mp4")
@@ -1,24 +1,53 @@
-from faster_whisper import WhisperModel
+from faster_whisper import WhisperModel, BatchedInferencePipeline
+import numpy as np
+import os
 
 audio_path = "voice.mp3"
 
-# tiny = fast + light
-model = WhisperModel("tiny", device="cpu", compute_type="int8")
+def load_model():
+    # tiny = fast + light
+    model = WhisperModel(
+        "tiny",
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=os.cpu_count(),
+        num_workers=2
+    )
+    # batches 30s windows together; VAD skips the silent parts
+    return BatchedInferencePipeline(model=model)
 
-segments, _ = model.transcribe(
-    audio_path,
-    word_timestamps=True
-)
+# audio can be a path or a file-like object
+def transcribe(model, audio):
+    segments, _ = model.transcribe(
+        audio,
+        word_timestamps=True,
+        vad_filter=True,
+        batch_size=8
+    )
 
-words_data = []
+    words_data = []
 
-for segment in segments:
-    for w in segment.words:
-        words_data.append((w.start, w.end, w.word.strip()))
+    for segment in segments:
+        for w in segment.words:
+            words_data.append((w.start, w.end, w.word.strip()))
 
-# save timestamps
-with open("timestamps.txt", "w", encoding="utf-8") as f:
-    for s,e,w in words_data:
-        f.write(f"{s:.2f}|{e:.2f}|{w}\n")
+    return words_data
 
-print("✅ Timestamps saved to timestamps.txt")
+# timestamps.txt stays for reading and editing; make_reel loads the .npz next to it
+# unless the txt is newer, as ready-made arrays instead of lines to split
+def save_timestamps(words_data, path="timestamps.txt"):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(f"{s:.2f}|{e:.2f}|{w}\n" for s,e,w in words_data))
+
+    starts, ends, words = zip(*words_data) if words_data else ((), (), ())
+    np.savez(
+        os.path.splitext(path)[0] + ".npz",
+        starts=np.round(np.array(starts, dtype=float), 2),
+        ends=np.round(np.array(ends, dtype=float), 2),
+        words=np.array(words, dtype=str)
+    )
+
+    print(f"✅ Timestamps saved to {path}")
+
+if __name__ == "__main__":
+    save_timestamps(transcribe(load_model(), audio_path))
@@ -4,8 +4,12 @@ Combines video, audio, and animated captions into final reel
 """
 
 import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any, Tuple
 import numpy as np
 
 try:
@@ -13,6 +17,8 @@ try:
         VideoFileClip, AudioFileClip, ImageClip,
         CompositeVideoClip, ColorClip
     )
+    from moviepy.config import get_setting
+    from moviepy.video.io import ffmpeg_reader
     from PIL import Image, ImageDraw, ImageFont
     # Pillow>=10 removed Image.ANTIALIAS, but MoviePy 1.x still references it.
     if not hasattr(Image, "ANTIALIAS") and hasattr(Image, "Resampling"):
@@ -35,32 +41,177 @@ HIGHLIGHT_WORDS = {
 }
 
 
+@lru_cache(maxsize=None)
+def _hw_encoder() -> Optional[str]:
+    """Return the hardware encoder ffmpeg can open on this machine, if any"""
+    
+    ffmpeg = get_setting("FFMPEG_BINARY")
+    try:
+        listed = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"],
+            capture_output=True, text=True
+        ).stdout
+    except OSError:
+        return None
+    
+    for encoder in ("h264_nvenc", "hevc_amf"):
+        if encoder not in listed:
+            continue
+        # Builds list these even without the hardware, so encode one frame to be sure
+        probe = subprocess.run(
+            [ffmpeg, "-hide_banner", "-loglevel", "error",
+             "-f", "lavfi", "-i", "color=black:s=256x256",
+             "-frames:v", "1", "-c:v", encoder, "-f", "null", "-"],
+            capture_output=True
+        )
+        if probe.returncode == 0:
+            return encoder
+    
+    return None
+
+
+def _encoder_params(use_gpu: bool, draft: bool = False) -> Dict[str, Any]:
+    """
+    Get codec, preset and ffmpeg_params for write_videofile
+    
+    Hardware encoders reject x264 preset names ("medium"), so each
+    backend gets a preset it understands. Falls back to libx264.
+    Draft renders use each encoder's fastest preset.
+    """
+    
+    encoder = _hw_encoder() if use_gpu else None
+    
+    if encoder == "h264_nvenc":
+        return {
+            "codec": "h264_nvenc",
+            "preset": "p1" if draft else "p5",
+            "ffmpeg_params": [
+                "-tune", "hq", "-rc", "vbr", "-cq", "23",
+                "-b:v", "8M", "-pix_fmt", "yuv420p"
+            ]
+        }
+    
+    if encoder == "hevc_amf":
+        quality = "speed" if draft else "quality"
+        return {
+            "codec": "hevc_amf",
+            "preset": quality,
+            "ffmpeg_params": ["-quality", quality, "-pix_fmt", "yuv420p"]
+        }
+    
+    return {
+        "codec": "libx264",
+        "preset": "ultrafast" if draft else "medium",
+        "ffmpeg_params": None
+    }
+
+
+# -hwaccel without an output format copies frames back to system memory,
+# which is what MoviePy's rawvideo pipe expects
+NVDEC_ARGS = ["-hwaccel", "cuda"]
+
+# Keeps decoded frames on the GPU, for filter graphs that start with scale_cuda
+NVDEC_CUDA_FRAMES_ARGS = ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+
+
+@lru_cache(maxsize=None)
+def _has_scale_cuda() -> bool:
+    """Whether this ffmpeg build has the scale_cuda filter"""
+    
+    try:
+        listed = subprocess.run(
+            [get_setting("FFMPEG_BINARY"), "-hide_banner", "-filters"],
+            capture_output=True, text=True
+        ).stdout
+    except OSError:
+        return False
+    
+    return " scale_cuda " in listed
+
+
+def _nvdec_initialize(self, starttime=0):
+    """FFMPEG_VideoReader.initialize (moviepy 1.0.3) with NVDEC in front of -i"""
+    
+    self.close()
+    
+    if starttime != 0:
+        offset = min(1, starttime)
+        i_arg = ["-ss", "%.06f" % (starttime - offset),
+                 *NVDEC_ARGS, "-i", self.filename,
+                 "-ss", "%.06f" % offset]
+    else:
+        i_arg = [*NVDEC_ARGS, "-i", self.filename]
+    
+    cmd = ([get_setting("FFMPEG_BINARY")] + i_arg +
+           ["-loglevel", "error",
+            "-f", "image2pipe",
+            "-vf", "scale=%d:%d" % tuple(self.size),
+            "-sws_flags", self.resize_algo,
+            "-pix_fmt", self.pix_fmt,
+            "-vcodec", "rawvideo", "-"])
+    popen_params = {
+        "bufsize": self.bufsize,
+        "stdout": subprocess.PIPE,
+        "stderr": subprocess.PIPE,
+        "stdin": subprocess.DEVNULL
+    }
+    
+    if os.name == "nt":
+        popen_params["creationflags"] = 0x08000000
+    
+    self.proc = subprocess.Popen(cmd, **popen_params)
+
+
+def _enable_nvdec(use_gpu: bool):
+    """Decode source clips on NVDEC when the NVENC backend is in use"""
+    
+    if use_gpu and _hw_encoder() == "h264_nvenc":
+        ffmpeg_reader.FFMPEG_VideoReader.initialize = _nvdec_initialize
+
+
 def get_word_color(word: str) -> str:
     """Get color for word based on content"""
     
-    word_lower = word.lower()
-    
-    # Numbers in green
-    if any(c.isdigit() for c in word):
+    # Numbers in green; plain words (the usual case) skip the digit scan,
+    # the rest ("mind-blowing", "wow!") still only go green with a digit
+    if not word.isalpha() and any(c.isdigit() for c in word):
         return "#4CFF00"
     
+    word_key = word.casefold()
+    
     # Danger words in red
-    if word_lower in DANGER_WORDS:
+    if word_key in DANGER_WORDS:
         return "#FF3B3B"
     
     # Highlight words in cyan
-    if word_lower in HIGHLIGHT_WORDS:
+    if word_key in HIGHLIGHT_WORDS:
         return "#00D9FF"
     
     # Default yellow
     return "#FFD93D"
 
 
+@lru_cache(maxsize=4)
+def _load_font(size: int):
+    """Load the caption font once per size instead of once per word"""
+    
+    # Try to load font, fallback if not available
+    try:
+        if os.name == 'nt':  # Windows
+            return ImageFont.truetype("C:/Windows/Fonts/arialbd.ttf", size)
+        else:  # Linux/Mac
+            return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", size)
+    except:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=256)
 def create_text_image(text: str) -> np.ndarray:
     """
     Create styled text image with background
     
-    Returns numpy array suitable for ImageClip
+    Cached per word, since short words repeat a lot in a script.
+    Returns a read-only numpy array suitable for ImageClip
     """
     
     # Image dimensions
@@ -70,14 +221,7 @@ def create_text_image(text: str) -> np.ndarray:
     img = Image.new("RGBA", (W, H), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
-    # Try to load font, fallback if not available
-    try:
-        if os.name == 'nt':  # Windows
-            font = ImageFont.truetype("C:/Windows/Fonts/arialbd.ttf", 56)
-        else:  # Linux/Mac
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 56)
-    except:
-        font = ImageFont.load_default()
+    font = _load_font(56)
     
     # Get text color
     color = get_word_color(text)
@@ -98,21 +242,39 @@ def create_text_image(text: str) -> np.ndarray:
     x = (W - text_width) // 2
     y = (H - text_height) // 2
     
-    # Draw text shadow for depth
-    for dx in range(-5, 6):
-        for dy in range(-5, 6):
-            if dx != 0 or dy != 0:
-                draw.text(
-                    (x + dx, y + dy),
-                    text,
-                    font=font,
-                    fill="black"
-                )
+    # Draw main text with a black outline for depth (single rasterization)
+    draw.text(
+        (x, y),
+        text,
+        font=font,
+        fill=color,
+        stroke_width=5,
+        stroke_fill=(0, 0, 0, 255)
+    )
     
-    # Draw main text
-    draw.text((x, y), text, font=font, fill=color)
+    # Single copy out of PIL; an array over bytes is read-only, so the
+    # cached bitmap is safe to share between every clip of the word
+    return np.frombuffer(img.tobytes("raw", "RGBA"), dtype=np.uint8).reshape(H, W, 4)
+
+
+# Output geometry shared by the ffmpeg and MoviePy render paths
+REEL_WIDTH = 720
+REEL_HEIGHT = 1280
+REEL_FPS = 24
+CAPTION_Y = 0.55       # Top of the caption, relative to frame height
+CAPTION_FADE = 0.08
+
+
+# Pop-in curve sampled once per output frame; after two seconds it is
+# 1 to six decimal places, so the last entry covers any longer word
+CAPTION_ZOOM_LUT = 1 + 0.4 * np.exp(-7 * np.arange(0, 2.0, 1 / REEL_FPS))
+
+
+def caption_zoom(t: float) -> float:
+    """Pop-in scale factor t seconds after a word appears"""
     
-    return np.array(img)
+    frame = min(int(round(t * REEL_FPS)), len(CAPTION_ZOOM_LUT) - 1)
+    return float(CAPTION_ZOOM_LUT[frame])
 
 
 def create_word_clip(word: str, start: float, end: float):
@@ -132,29 +294,373 @@ def create_word_clip(word: str, start: float, end: float):
         ImageClip(img)
         .set_start(start)
         .set_duration(duration)
-        .set_position(("center", 0.55), relative=True)  # Slightly above center
-        .resize(lambda t: 1 + 0.4 * np.exp(-7 * t))      # Pop-in effect
-        .fadein(0.08)
-        .fadeout(0.08)
+        .set_position(("center", CAPTION_Y), relative=True)  # Slightly above center
+        .resize(caption_zoom)                                # Pop-in effect
+        .fadein(CAPTION_FADE)
+        .fadeout(CAPTION_FADE)
     )
 
 
+def _encoder_args(use_gpu: bool, draft: bool = False) -> List[str]:
+    """Encoder settings from _encoder_params as ffmpeg arguments"""
+    
+    # No -threads: ffmpeg already runs libx264 with threads=auto
+    params = _encoder_params(use_gpu, draft)
+    args = ["-c:v", params["codec"], "-preset", params["preset"]]
+    return args + (params["ffmpeg_params"] or ["-pix_fmt", "yuv420p"])
+
+
+# A caption renders and saves in about 5 ms, while a spawned worker
+# (Windows, and the default start method from Python 3.14) re-imports the
+# main module and MoviePy, roughly 0.5-1 s each. With 4 workers that
+# only pays off from ~270 distinct words, far beyond a normal reel, and
+# the create_text_image cache does nothing in short-lived workers.
+PARALLEL_CAPTIONS_MIN = 300
+CAPTION_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def _save_caption_png(word: str, path: str):
+    """Render one caption and write it as a PNG (also run in worker processes)"""
+    
+    Image.fromarray(create_text_image(word)).save(path, compress_level=1)
+
+
+def _save_caption_pngs(pngs: Dict[str, Path]) -> List[str]:
+    """
+    Write the caption PNG of every word, returns the words that failed
+    
+    Text rasterising is CPU-bound Python, so very long scripts are
+    spread over a small process pool. Workers write the PNG themselves,
+    so only the word and its path cross the process boundary.
+    """
+    
+    failed = []
+    
+    if len(pngs) < PARALLEL_CAPTIONS_MIN or CAPTION_WORKERS < 2:
+        for word, path in pngs.items():
+            try:
+                _save_caption_png(word, str(path))
+            except Exception as e:
+                print(f"⚠️  Skipping word '{word}': {e}")
+                failed.append(word)
+        return failed
+    
+    with ProcessPoolExecutor(max_workers=CAPTION_WORKERS) as pool:
+        futures = {
+            word: pool.submit(_save_caption_png, word, str(path))
+            for word, path in pngs.items()
+        }
+    
+    for word, future in futures.items():
+        if future.exception() is not None:
+            print(f"⚠️  Skipping word '{word}': {future.exception()}")
+            failed.append(word)
+    
+    return failed
+
+
+def _caption_graph(
+    timestamps: List[Dict],
+    png_dir: Path,
+    first_input: int,
+    background: str
+) -> Tuple[List[str], List[str], str]:
+    """
+    Build ffmpeg inputs and filters that pop captions over a stream
+    
+    Each distinct word is saved as a PNG once and becomes one input. The
+    filter graph splits it per occurrence, holds it for the word's
+    frames, and does the pop-in scale and fades itself, the same curve
+    as create_word_clip. So no caption frame is produced in Python.
+    
+    Returns:
+        (input args, filter chains, label of the captioned stream)
+    """
+    
+    occurrences: Dict[str, List[Tuple[int, int, int]]] = {}
+    
+    for order, ts in enumerate(timestamps):
+        # Frames MoviePy would show the word on: start <= t < end
+        first = int(np.ceil(ts['start'] * REEL_FPS))
+        frames = int(np.ceil(ts['end'] * REEL_FPS)) - first
+        if frames > 0:
+            occurrences.setdefault(ts['word'].upper(), []).append((order, first, frames))
+    
+    # Named after the input index, so reels sharing png_dir never clash
+    pngs = {
+        word: png_dir / f"{n}.png"
+        for n, word in enumerate(occurrences, first_input)
+    }
+    for word in _save_caption_pngs(pngs):
+        del occurrences[word]
+    
+    inputs, filters, layers = [], [], []
+    
+    for index, (word, spans) in enumerate(occurrences.items(), first_input):
+        inputs += ["-i", str(pngs[word])]
+        copies = "".join(f"[w{index}_{i}]" for i in range(len(spans)))
+        filters.append(f"[{index}:v]split={len(spans)}{copies}")
+        
+        for i, (order, first, frames) in enumerate(spans):
+            fade_out = max(0.0, frames / REEL_FPS - CAPTION_FADE)
+            tag = f"{index}_{i}"
+            filters.append(
+                f"[w{tag}]loop=loop={frames - 1}:size=1,"
+                f"settb=1/{REEL_FPS},setpts=N,format=rgba,split[rgb{tag}][a{tag}]"
+            )
+            # ffmpeg's fade on rgba also fades alpha; MoviePy's fadein/fadeout
+            # only darken the colour, so fade RGB alone and put the mask back
+            filters.append(f"[a{tag}]alphaextract[m{tag}]")
+            filters.append(
+                f"[rgb{tag}]format=rgb24,"
+                f"fade=t=in:st=0:d={CAPTION_FADE},"
+                f"fade=t=out:st={fade_out:.3f}:d={CAPTION_FADE}[f{tag}]"
+            )
+            filters.append(
+                f"[f{tag}][m{tag}]alphamerge,"
+                # Pop-in effect, caption_zoom evaluated by ffmpeg per frame
+                f"scale=w='iw*(1+0.4*exp(-7*t))':h=-1:eval=frame,"
+                f"setpts=PTS+{first}[c{tag}]"
+            )
+            layers.append((order, f"[c{tag}]"))
+    
+    # Same stacking as CompositeVideoClip: later words on top
+    stream = background
+    y = int(CAPTION_Y * REEL_HEIGHT)
+    
+    for n, (_, layer) in enumerate(sorted(layers)):
+        filters.append(
+            f"{stream}{layer}overlay=x=(main_w-overlay_w)/2:y={y}"
+            f":eof_action=pass:format=auto[o{first_input}_{n}]"
+        )
+        stream = f"[o{first_input}_{n}]"
+    
+    return inputs, filters, stream
+
+
+def _reel_job(
+    spec: Dict[str, Any],
+    png_dir: Path,
+    first_input: int,
+    use_gpu: bool,
+    draft: bool,
+    cuda_frames: bool = False
+) -> Tuple[List[str], List[str], List[str]]:
+    """
+    ffmpeg inputs, filters and output args for one reel
+    
+    The background is input first_input, the voiceover the next one and
+    the caption PNGs follow, so several reels can share one command.
+    With cuda_frames the decoded background stays on the GPU until it
+    has been scaled, and only the 1280-high frame is downloaded. A
+    draft key in the spec overrides draft for this reel's encoder.
+    
+    Returns:
+        (input args, filter chains, output args)
+    """
+    
+    duration = ffmpeg_reader.ffmpeg_parse_infos(spec["audio_path"])["duration"]
+    
+    # Resize to match height, crop to center if too wide, pad if too narrow
+    if cuda_frames:
+        hwaccel = NVDEC_CUDA_FRAMES_ARGS
+        scale = f"scale_cuda=w=-2:h={REEL_HEIGHT}:format=nv12,hwdownload,format=nv12"
+    else:
+        hwaccel = NVDEC_ARGS if use_gpu and _hw_encoder() == "h264_nvenc" else []
+        scale = f"scale=-2:{REEL_HEIGHT}"
+    
+    background = (
+        f"{scale},"
+        f"crop='min(iw,{REEL_WIDTH})':{REEL_HEIGHT},"
+        f"pad={REEL_WIDTH}:{REEL_HEIGHT}:(ow-iw)/2:0:black,"
+        f"setsar=1,fps={REEL_FPS}"
+    )
+    
+    # Loop the background only when it is shorter than the voiceover;
+    # otherwise -t alone trims it and the demuxer never seeks back
+    video_duration = ffmpeg_reader.ffmpeg_parse_infos(spec["video_path"])["duration"]
+    loop = ["-stream_loop", "-1"] if video_duration < duration else []
+    
+    bg = f"[bg{first_input}]"
+    caption_inputs, caption_filters, video_out = _caption_graph(
+        spec["timestamps"], png_dir, first_input + 2, background=bg
+    )
+    
+    inputs = [
+        *hwaccel, *loop, "-i", spec["video_path"],
+        "-i", spec["audio_path"],
+        *caption_inputs
+    ]
+    filters = [f"[{first_input}:v]{background}{bg}"] + caption_filters
+    outputs = [
+        "-map", video_out, "-map", f"{first_input + 1}:a",
+        *_encoder_args(use_gpu, spec.get("draft", draft)),
+        "-c:a", "aac", "-b:a", "192k",
+        "-t", f"{duration:.3f}",
+        str(spec["output_path"])
+    ]
+    
+    return inputs, filters, outputs
+
+
+def _render_with_ffmpeg(specs: List[Dict[str, Any]], use_gpu: bool, draft: bool):
+    """
+    Render one or more reels in a single ffmpeg process
+    
+    ffmpeg decodes, fits and loops each background, animates and
+    overlays the caption PNGs, and encodes every reel as its own
+    output. With NVENC the background is scaled on the GPU, and the
+    graph is retried with CPU scaling if the driver rejects it. Raises
+    CalledProcessError if ffmpeg fails.
+    """
+    
+    gpu_scaling = use_gpu and _hw_encoder() == "h264_nvenc" and _has_scale_cuda()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        
+        for cuda_frames in ([True, False] if gpu_scaling else [False]):
+            inputs, filters, outputs = [], [], []
+            
+            for spec in specs:
+                print(f"   Creating {len(spec['timestamps'])} captions...")
+                job_inputs, job_filters, job_outputs = _reel_job(
+                    spec, tmp, inputs.count("-i"), use_gpu, draft, cuda_frames
+                )
+                inputs += job_inputs
+                filters += job_filters
+                outputs += job_outputs
+            
+            # Passed as a file: a long script is too big for a Windows command line
+            graph = tmp / "graph.txt"
+            graph.write_text(";\n".join(filters), encoding="utf-8")
+            
+            cmd = [
+                get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                *inputs,
+                "-filter_complex_script", str(graph),
+                *outputs
+            ]
+            
+            print("   Rendering...")
+            try:
+                subprocess.run(cmd, check=True)
+                return
+            except subprocess.CalledProcessError:
+                if not cuda_frames:
+                    raise
+                print("⚠️  GPU scaling failed, retrying with CPU scaling")
+
+
+def _render_with_moviepy(
+    video_path: str,
+    audio_path: str,
+    timestamps: List[Dict],
+    output_path: Path,
+    use_gpu: bool,
+    draft: bool
+):
+    """Render the reel by compositing ImageClips in MoviePy (slow fallback)"""
+    
+    # Load video
+    print("   Loading video...")
+    _enable_nvdec(use_gpu)
+    video = VideoFileClip(video_path)
+    
+    # Resize to match height
+    video = video.resize(height=REEL_HEIGHT)
+    
+    # Crop to center if too wide
+    if video.w > REEL_WIDTH:
+        x_center = video.w / 2
+        video = video.crop(
+            x_center=x_center,
+            width=REEL_WIDTH,
+            height=REEL_HEIGHT
+        )
+    # Pad if too narrow
+    elif video.w < REEL_WIDTH:
+        padding = (REEL_WIDTH - video.w) // 2
+        video = video.margin(
+            left=padding,
+            right=padding,
+            color=(0, 0, 0)
+        )
+    
+    # Load audio
+    print("   Loading audio...")
+    audio = AudioFileClip(audio_path)
+    
+    # Loop video to match audio duration
+    if video.duration < audio.duration:
+        video = video.loop(duration=audio.duration)
+    else:
+        video = video.subclip(0, audio.duration)
+    
+    # Set audio
+    video = video.set_audio(audio)
+    
+    # Create caption clips
+    print(f"   Creating {len(timestamps)} caption clips...")
+    caption_clips = []
+    
+    for ts in timestamps:
+        try:
+            clip = create_word_clip(
+                word=ts['word'],
+                start=ts['start'],
+                end=ts['end']
+            )
+            caption_clips.append(clip)
+        except Exception as e:
+            print(f"⚠️  Skipping word '{ts['word']}': {e}")
+    
+    print(f"   Added {len(caption_clips)} captions")
+    
+    # Composite all clips
+    print("   Compositing final video...")
+    final = CompositeVideoClip([video] + caption_clips)
+    
+    # Write final video
+    print("   Rendering (this may take a few minutes)...")
+    final.write_videofile(
+        str(output_path),
+        fps=REEL_FPS,
+        **_encoder_params(use_gpu, draft),
+        audio_codec="aac",
+        audio_bitrate="192k",
+        threads=os.cpu_count()
+    )
+    
+    # Clean up
+    video.close()
+    audio.close()
+    final.close()
+
+
 async def compose_reel(
     video_path: str,
     audio_path: str,
     script: str,
     timestamps: List[Dict],
-    output_name: str = "final_reel.mp4"
+    output_name: str = "final_reel.mp4",
+    use_gpu: bool = True,
+    draft: bool = False
 ) -> Optional[str]:
     """
     Compose final reel with video, audio, and captions
     
+    Renders with a single ffmpeg pass and falls back to MoviePy
+    compositing if ffmpeg rejects the filter graph.
+    
     Args:
         video_path: Path to background video
         audio_path: Path to voiceover audio
         script: The script text
         timestamps: List of word timestamps
         output_name: Output filename
+        use_gpu: Encode with NVENC/AMF when available
+        draft: Fastest encoder preset, for previews
     
     Returns:
         Path to final video file
@@ -163,89 +669,23 @@ async def compose_reel(
     print("🎬 Composing final reel...")
     
     try:
-        # Load video
-        print("   Loading video...")
-        video = VideoFileClip(video_path)
-        
-        # Resize and crop to 9:16 aspect ratio (720x1280)
-        target_width = 720
-        target_height = 1280
-        
-        # Resize to match height
-        video = video.resize(height=target_height)
-        
-        # Crop to center if too wide
-        if video.w > target_width:
-            x_center = video.w / 2
-            video = video.crop(
-                x_center=x_center,
-                width=target_width,
-                height=target_height
-            )
-        # Pad if too narrow
-        elif video.w < target_width:
-            padding = (target_width - video.w) // 2
-            video = video.margin(
-                left=padding,
-                right=padding,
-                color=(0, 0, 0)
-            )
-        
-        # Load audio
-        print("   Loading audio...")
-        audio = AudioFileClip(audio_path)
-        
-        # Loop video to match audio duration
-        if video.duration < audio.duration:
-            video = video.loop(duration=audio.duration)
-        else:
-            video = video.subclip(0, audio.duration)
-        
-        # Set audio
-        video = video.set_audio(audio)
-        
-        # Create caption clips
-        print(f"   Creating {len(timestamps)} caption clips...")
-        caption_clips = []
-        
-        for ts in timestamps:
-            try:
-                clip = create_word_clip(
-                    word=ts['word'],
-                    start=ts['start'],
-                    end=ts['end']
-                )
-                caption_clips.append(clip)
-            except Exception as e:
-                print(f"⚠️  Skipping word '{ts['word']}': {e}")
-        
-        print(f"   Added {len(caption_clips)} captions")
-        
-        # Composite all clips
-        print("   Compositing final video...")
-        final = CompositeVideoClip([video] + caption_clips)
-        
         # Output path
         output_dir = Path("output")
         output_dir.mkdir(exist_ok=True)
         output_path = output_dir / output_name
         
-        # Write final video
-        print("   Rendering (this may take a few minutes)...")
-        final.write_videofile(
-            str(output_path),
-            fps=24,
-            codec="libx264",
-            preset="medium",  # Balance between speed and quality
-            audio_codec="aac",
-            audio_bitrate="192k",
-            threads=4
-        )
-        
-        # Clean up
-        video.close()
-        audio.close()
-        final.close()
+        try:
+            _render_with_ffmpeg([{
+                "video_path": video_path,
+                "audio_path": audio_path,
+                "timestamps": timestamps,
+                "output_path": output_path
+            }], use_gpu, draft)
+        except subprocess.CalledProcessError as e:
+            print(f"⚠️  ffmpeg render failed (exit {e.returncode}), falling back to MoviePy")
+            _render_with_moviepy(
+                video_path, audio_path, timestamps, output_path, use_gpu, draft
+            )
         
         print(f"✅ Reel saved: {output_path}")
         return str(output_path)
@@ -257,42 +697,99 @@ async def compose_reel(
         return None
 
 
+# Reels per ffmpeg process in batch_compose. Consumer NVIDIA cards cap
+# concurrent NVENC sessions, and every reel in a batch holds one.
+BATCH_SIZE = 4
+
+
+async def batch_compose(
+    specs: List[Dict[str, Any]],
+    use_gpu: bool = True,
+    draft: bool = False
+) -> List[Optional[str]]:
+    """
+    Compose several reels, BATCH_SIZE at a time per ffmpeg process
+    
+    Saves the process start-up and encoder initialisation of one
+    compose_reel call per reel. If a batch fails, its reels are
+    composed one by one, so a bad input only costs its own reel.
+    
+    Args:
+        specs: compose_reel arguments per reel: video_path, audio_path,
+            script, timestamps and optionally output_name and draft
+        use_gpu: Encode with NVENC/AMF when available
+        draft: Fastest encoder preset, for reels whose spec sets no draft
+    
+    Returns:
+        Path to each final video file, None for reels that failed
+    """
+    
+    print(f"🎬 Composing {len(specs)} reels...")
+    
+    output_dir = Path("output")
+    output_dir.mkdir(exist_ok=True)
+    
+    results: List[Optional[str]] = []
+    
+    for offset in range(0, len(specs), BATCH_SIZE):
+        batch = [
+            {
+                **spec,
+                "output_path": output_dir / spec.get("output_name", f"reel_{n}.mp4")
+            }
+            for n, spec in enumerate(specs[offset:offset + BATCH_SIZE], offset + 1)
+        ]
+    
+        try:
+            _render_with_ffmpeg(batch, use_gpu, draft)
+        except Exception as e:
+            print(f"⚠️  Batch render failed ({e}), composing reels one by one")
+            for spec in batch:
+                results.append(await compose_reel(
+                    video_path=spec["video_path"],
+                    audio_path=spec["audio_path"],
+                    script=spec.get("script", ""),
+                    timestamps=spec["timestamps"],
+                    output_name=spec["output_path"].name,
+                    use_gpu=use_gpu,
+                    draft=spec.get("draft", draft)
+                ))
+            continue
+    
+        for spec in batch:
+            print(f"✅ Reel saved: {spec['output_path']}")
+            results.append(str(spec["output_path"]))
+    
+    return results
+
+
 def create_simple_reel(
     video_path: str,
     audio_path: str,
-    output_name: str = "simple_reel.mp4"
+    output_name: str = "simple_reel.mp4",
+    use_gpu: bool = True
 ) -> Optional[str]:
     """
     Create simple reel without captions (fallback option)
+    
+    The same ffmpeg render as compose_reel with no caption inputs, so
+    the background is fitted, padded and looped by ffmpeg.
     """
     
     try:
         print("🎬 Creating simple reel (no captions)...")
         
-        video = VideoFileClip(video_path)
-        audio = AudioFileClip(audio_path)
-        
-        # Resize to 9:16
-        video = video.resize(height=1280)
-        if video.w > 720:
-            video = video.crop(x_center=video.w/2, width=720, height=1280)
-        
-        # Match duration
-        video = video.loop(duration=audio.duration).set_audio(audio)
-        
         # Output
         output_dir = Path("output")
+        output_dir.mkdir(exist_ok=True)
         output_path = output_dir / output_name
         
-        video.write_videofile(
-            str(output_path),
-            fps=24,
-            codec="libx264",
-            audio_codec="aac"
-        )
-        
-        video.close()
-        audio.close()
+        _render_with_ffmpeg([{
+            "video_path": video_path,
+            "audio_path": audio_path,
+            "timestamps": [],
+            "output_path": output_path
+        }], use_gpu, draft=False)
         
         return str(output_path)
         
@@ -9,12 +9,12 @@ import ast
 import asyncio
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
 
 # Import modules
-from videogenerator import generate_video
+from videogenerator import generate_video, close_session
 from scriptgenrator import generate_script_and_voice
-from reelcomposer import compose_reel
+from reelcomposer import compose_reel, batch_compose
 
 
 class ReelGenerator:
@@ -23,12 +23,8 @@ class ReelGenerator:
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
 
-    async def generate(self):
-        """Main pipeline to generate reel"""
-
-        print("=" * 60)
-        print("AI REEL GENERATOR")
-        print("=" * 60)
+    async def prepare(self) -> Optional[Dict[str, Any]]:
+        """Generate the script, voiceover and background video (steps 1-2)"""
 
         # Step 1: Generate script and voiceover
         print("\n[1/3] Generating script and voiceover...")
@@ -60,14 +56,33 @@ class ReelGenerator:
 
         print(f"Video generated: {video_data['video_path']}")
 
+        return {
+            "script": script_data["script"],
+            "video_path": video_data["video_path"],
+            "audio_path": script_data["voice_path"],
+            "timestamps": script_data["timestamps"]
+        }
+
+    async def generate(self):
+        """Main pipeline to generate reel"""
+
+        print("=" * 60)
+        print("AI REEL GENERATOR")
+        print("=" * 60)
+
+        spec = await self.prepare()
+        if not spec:
+            return None
+
         # Step 3: Compose final reel
         print("\n[3/3] Composing final reel with captions...")
         final_path = await compose_reel(
-            video_path=video_data["video_path"],
-            audio_path=script_data["voice_path"],
-            script=script_data["script"],
-            timestamps=script_data["timestamps"],
-            output_name=self.config.get("output_name", "final_reel.mp4")
+            video_path=spec["video_path"],
+            audio_path=spec["audio_path"],
+            script=spec["script"],
+            timestamps=spec["timestamps"],
+            output_name=self.config.get("output_name", "final_reel.mp4"),
+            draft=self.config.get("draft", False)
         )
 
         if not final_path:
@@ -78,14 +93,65 @@ class ReelGenerator:
         print("=" * 60)
 
         return {
-            "script": script_data["script"],
-            "video_path": video_data["video_path"],
+            "script": spec["script"],
+            "video_path": spec["video_path"],
             "final_path": final_path
         }
 
 
-def load_config() -> Dict[str, Any]:
-    """Load configuration from command line JSON or use defaults"""
+async def generate_batch(configs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Generate several reels and compose them together
+
+    Scripts and videos are generated reel by reel, then every reel is
+    composed in one batch_compose call instead of one ffmpeg run each.
+    """
+
+    print("=" * 60)
+    print(f"AI REEL GENERATOR - BATCH OF {len(configs)}")
+    print("=" * 60)
+
+    specs = []
+
+    for n, config in enumerate(configs, 1):
+        print(f"\n--- Reel {n}/{len(configs)} ---")
+        spec = await ReelGenerator(config).prepare()
+
+        if spec:
+            # The voiceover always goes to output/audio/voice.mp3, keep this
+            # reel's copy before the next one overwrites it
+            voice = Path(spec["audio_path"])
+            spec["audio_path"] = str(voice.replace(voice.with_name(f"voice_{n}.mp3")))
+            spec["output_name"] = config.get("output_name", f"final_reel_{n}.mp4")
+            spec["draft"] = config.get("draft", False)
+
+        specs.append(spec)
+
+    ready = [spec for spec in specs if spec]
+    if not ready:
+        return [None] * len(configs)
+
+    print(f"\n[3/3] Composing {len(ready)} reels with captions...")
+    final_paths = iter(await batch_compose(ready))
+
+    results = []
+    for spec in specs:
+        final_path = next(final_paths) if spec else None
+        results.append({
+            "script": spec["script"],
+            "video_path": spec["video_path"],
+            "final_path": final_path
+        } if final_path else None)
+
+    return results
+
+
+def load_config() -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Load configuration from command line JSON or use defaults
+
+    A list of configs generates a batch of reels.
+    """
 
     if len(sys.argv) > 1:
         # Join all args so PowerShell splitting does not break JSON payloads
@@ -102,7 +168,7 @@ def load_config() -> Dict[str, Any]:
         # Then try Python-literal dict syntax as a fallback
         try:
             parsed = ast.literal_eval(config_raw)
-            if isinstance(parsed, dict):
+            if isinstance(parsed, (dict, list)):
                 print("Loaded configuration from command line (literal dict fallback)")
                 return parsed
         except Exception:
@@ -124,25 +190,41 @@ def load_config() -> Dict[str, Any]:
 async def main():
     """Main entry point"""
 
-    # Load configuration
-    config = load_config()
-
-    print("\nConfiguration:")
-    print(json.dumps(config, indent=2))
-    print()
-
-    # Generate reel
-    generator = ReelGenerator(config)
-    result = await generator.generate()
-
-    if result:
-        print("\nSuccess! Here's what was created:")
-        print(f"   Script: {result['script'][:100]}...")
-        print(f"   Video: {result['video_path']}")
-        print(f"   Final: {result['final_path']}")
-    else:
-        print("\nFailed to generate reel")
-        sys.exit(1)
+    try:
+        # Load configuration
+        config = load_config()
+
+        print("\nConfiguration:")
+        print(json.dumps(config, indent=2))
+        print()
+
+        if isinstance(config, list):
+            results = await generate_batch(config)
+            done = [result for result in results if result]
+
+            print(f"\n{len(done)}/{len(results)} reels created:")
+            for result in done:
+                print(f"   Final: {result['final_path']}")
+
+            if not done:
+                sys.exit(1)
+            return
+
+        # Generate reel
+        generator = ReelGenerator(config)
+        result = await generator.generate()
+
+        if result:
+            print("\nSuccess! Here's what was created:")
+            print(f"   Script: {result['script'][:100]}...")
+            print(f"   Video: {result['video_path']}")
+            print(f"   Final: {result['final_path']}")
+        else:
+            print("\nFailed to generate reel")
+            sys.exit(1)
+    finally:
+        # Shared HTTP session from videogenerator
+        await close_session()
 
 
 if __name__ == "__main__":
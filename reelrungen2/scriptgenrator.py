@@ -8,16 +8,19 @@ import re
 import asyncio
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import date
 import random
+import numpy as np
 from dotenv import load_dotenv
 
 try:
     from google import genai
+    from google.genai import errors as genai_errors
     import edge_tts
+    from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 except ImportError:
-    print("⚠️  Install required packages: pip install google-generativeai edge-tts --break-system-packages")
+    print("⚠️  Install required packages: pip install google-generativeai edge-tts tenacity --break-system-packages")
     raise
 
 load_dotenv()
@@ -29,6 +32,47 @@ if not GEMINI_API_KEY:
 
 client = genai.Client(api_key=GEMINI_API_KEY)
 
+# Max Gemini requests in flight across the whole pipeline
+GEMINI_CONCURRENCY = 8
+_gemini_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_gemini_semaphore() -> asyncio.Semaphore:
+    """Create the semaphore lazily so it binds to the running event loop"""
+    
+    global _gemini_semaphore
+    if _gemini_semaphore is None:
+        _gemini_semaphore = asyncio.Semaphore(GEMINI_CONCURRENCY)
+    return _gemini_semaphore
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Rate limits and server errors are worth retrying, bad requests are not"""
+    
+    return isinstance(exc, genai_errors.APIError) and exc.code in (429, 500, 502, 503, 504)
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=wait_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+async def gemini_generate(prompt: str, model: str = "gemini-2.5-flash") -> str:
+    """
+    Generate text with Gemini without blocking the event loop
+    
+    Each attempt holds a semaphore slot only while the request is in
+    flight, so backoff sleeps don't block other callers.
+    """
+    
+    async with _get_gemini_semaphore():
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=prompt
+        )
+    return response.text
+
 
 async def generate_script_and_voice(
     topic: str = "random",
@@ -50,31 +94,39 @@ async def generate_script_and_voice(
     print(f"📝 Generating {tone} script about: {topic}")
     
     # Generate script
-    script = generate_script(topic, tone, duration)
+    script = await generate_script(topic, tone, duration)
     if not script:
         return None
     
     print(f"✅ Script generated ({len(script.split())} words)")
     
-    # Generate visual prompt for AI image generation
-    video_prompt = generate_video_prompt(script, tone)
+    # Visual prompt and voiceover both only need the script, so the
+    # Gemini round-trip runs while edge-tts is synthesizing
+    video_prompt, voice = await asyncio.gather(
+        generate_video_prompt(script, tone),
+        generate_voice(script, tone),
+        return_exceptions=True
+    )
     
-    # Generate voiceover
-    voice_path = await generate_voice(script, tone)
-    if not voice_path:
+    if isinstance(video_prompt, BaseException):
+        video_prompt = fallback_video_prompt(tone)
+    
+    if isinstance(voice, BaseException):
+        print(f"❌ Error generating voice: {voice}")
+        return None
+    if not voice:
         return None
     
+    voice_path, audio_duration, boundaries = voice
+    
     print(f"✅ Voiceover generated: {voice_path}")
     
-    # Generate timestamps for word-by-word captions
-    timestamps = generate_timestamps(script)
+    # Word-by-word caption timing as spoken, estimated if edge-tts sent none
+    timestamps = timestamps_from_boundaries(boundaries) or generate_timestamps(script)
     
     # Save timestamps to file
     save_timestamps(timestamps)
     
-    # Calculate actual duration from voice
-    audio_duration = await get_audio_duration(voice_path)
-    
     return {
         "script": script,
         "voice_path": str(voice_path),
@@ -86,7 +138,7 @@ async def generate_script_and_voice(
     }
 
 
-def generate_script(topic: str, tone: str, duration: int) -> Optional[str]:
+async def generate_script(topic: str, tone: str, duration: int) -> Optional[str]:
     """Generate viral script using Gemini"""
     
     # Create prompt based on topic
@@ -122,12 +174,7 @@ Format: Just the narration script, nothing else.
 """
     
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
-        
-        script = response.text.strip()
+        script = (await gemini_generate(prompt)).strip()
         
         # Clean up any markdown
         if script.startswith("```"):
@@ -145,7 +192,7 @@ Format: Just the narration script, nothing else.
         return None
 
 
-def generate_video_prompt(script: str, tone: str) -> str:
+async def generate_video_prompt(script: str, tone: str) -> str:
     """Generate a video prompt based on the script"""
     
     # Extract key visual elements from script
@@ -161,37 +208,45 @@ Style: {tone}, engaging, professional.
 Format: Just the description, nothing else.
 """
         
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
-        
-        video_prompt = response.text.strip()
+        video_prompt = (await gemini_generate(prompt)).strip()
         return video_prompt
         
     except:
-        # Fallback generic prompt
-        return f"Cinematic {tone} visuals with dynamic movement and engaging composition"
+        return fallback_video_prompt(tone)
+
+
+def fallback_video_prompt(tone: str) -> str:
+    """Generic video prompt for when Gemini can't write one"""
+    
+    return f"Cinematic {tone} visuals with dynamic movement and engaging composition"
+
+
+# Text cleanup patterns, compiled once instead of on every call
+_WS_RE = re.compile(r"\s+")
+_DUP_COMMA_RE = re.compile(r",\s*,+")
+_ELLIPSIS_RE = re.compile(r"\.{4,}")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_DASH_RE = re.compile(r" -- | - ")
+
+# Single-character swaps done in one translate pass
+_PAUSE_TRANS = str.maketrans({";": ",", ":": ",", "(": ", ", ")": ""})
 
 
 def humanize_for_tts(text: str) -> str:
     """Make text more natural for text-to-speech"""
     
     # Normalize whitespace
-    cleaned = re.sub(r"\s+", " ", text).strip()
+    cleaned = _WS_RE.sub(" ", text).strip()
     
-    # Normalize punctuation for smoother pauses
-    cleaned = cleaned.replace(";", ",")
-    cleaned = cleaned.replace(":", ",")
-    cleaned = cleaned.replace(" - ", ", ")
-    cleaned = cleaned.replace(" -- ", ", ")
-    cleaned = cleaned.replace("(", ", ").replace(")", "")
+    # Normalize punctuation for smoother pauses; dashes go first, before
+    # a dropped ")" can turn " -) " into a dash of its own
+    cleaned = _DASH_RE.sub(", ", cleaned).translate(_PAUSE_TRANS)
     
     # Remove duplicate commas
-    cleaned = re.sub(r",\s*,+", ", ", cleaned)
+    cleaned = _DUP_COMMA_RE.sub(", ", cleaned)
     
     # Normalize ellipses
-    cleaned = re.sub(r"\.{4,}", "...", cleaned)
+    cleaned = _ELLIPSIS_RE.sub("...", cleaned)
     
     # Add pause after opening hook
     if "." in cleaned:
@@ -202,11 +257,90 @@ def humanize_for_tts(text: str) -> str:
     return cleaned
 
 
+# Parallel edge-tts sessions; many more at once risks a temporary ban
+TTS_CONCURRENCY = 4
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+")
+_WORD_RE = re.compile(r"\w")
+
+# edge-tts speaks audio-24khz-48kbitrate-mono-mp3: constant bitrate, so
+# the byte count gives the duration without decoding the file
+MP3_BYTES_PER_SECOND = 48_000 // 8
+
+# WordBoundary offsets and durations are in 100 ns ticks
+TICKS_PER_SECOND = 10_000_000
+
+
+def split_sentences(script: str) -> List[str]:
+    """
+    Split narration into sentences, after . ! ? or … and a space
+    
+    A piece with no words ("...", "!") gets no audio from edge-tts, so
+    it is kept with the sentence before it (or after it, at the start).
+    """
+    
+    sentences: List[str] = []
+    
+    for piece in _SENTENCE_END_RE.split(script.strip()):
+        if not piece:
+            continue
+        if sentences and not (_WORD_RE.search(piece) and _WORD_RE.search(sentences[-1])):
+            sentences[-1] += f" {piece}"
+        else:
+            sentences.append(piece)
+    
+    return sentences
+
+
+async def synthesize_sentence(
+    text: str,
+    voice: str,
+    rate: str,
+    pitch: str,
+    semaphore: asyncio.Semaphore
+) -> Tuple[bytes, List[Dict[str, Any]]]:
+    """
+    Stream one edge-tts session into memory
+    
+    Returns:
+        (MP3 bytes, WordBoundary events)
+    """
+    
+    audio = bytearray()
+    boundaries = []
+    
+    async with semaphore:
+        # The boundary keyword needs edge-tts 7.2.0; older 7.x releases
+        # reject or ignore it
+        communicate = edge_tts.Communicate(
+            text=text,
+            voice=voice,
+            rate=rate,
+            pitch=pitch,
+            volume="+0%",
+            boundary="WordBoundary"
+        )
+        
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                audio += chunk["data"]
+            elif chunk["type"] == "WordBoundary":
+                boundaries.append(chunk)
+    
+    return bytes(audio), boundaries
+
+
 async def generate_voice(
     script: str,
     tone: str
-) -> Optional[Path]:
-    """Generate voiceover using edge-tts"""
+) -> Optional[Tuple[Path, float, List[Dict[str, Any]]]]:
+    """
+    Generate voiceover using edge-tts
+    
+    Returns:
+        (voice path, duration in seconds, WordBoundary events timed
+        from the start of the whole voiceover)
+    """
     
     output_dir = Path("output/audio")
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -239,66 +373,101 @@ async def generate_voice(
         pitch = "+2Hz"
     
     try:
-        communicate = edge_tts.Communicate(
-            text=script,
-            voice=voice,
-            rate=rate,
-            pitch=pitch,
-            volume="+0%"
-        )
+        # One edge-tts session per sentence, synthesized side by side
+        semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+        try:
+            parts = await asyncio.gather(*(
+                synthesize_sentence(sentence, voice, rate, pitch, semaphore)
+                for sentence in split_sentences(script)
+            ))
+        except Exception as e:
+            # One bad sentence should not cost the reel; fall back to
+            # the whole script in a single session
+            print(f"⚠️  Sentence synthesis failed ({e}), retrying as one session")
+            parts = [await synthesize_sentence(script, voice, rate, pitch, semaphore)]
         
-        await communicate.save(str(voice_path))
-        return voice_path
+        # Shift each sentence's word events by the audio before it
+        boundaries = []
+        elapsed = 0
+        
+        for audio, events in parts:
+            ticks = elapsed * TICKS_PER_SECOND // MP3_BYTES_PER_SECOND
+            boundaries += [{**event, "offset": event["offset"] + ticks} for event in events]
+            elapsed += len(audio)
+        
+        # edge-tts sends bare MP3 frames, so the parts join byte for byte
+        voice_path.write_bytes(b"".join(audio for audio, _ in parts))
+        return voice_path, elapsed / MP3_BYTES_PER_SECOND, boundaries
         
     except Exception as e:
         print(f"❌ Error generating voice: {e}")
         return None
 
 
-def generate_timestamps(script: str) -> list:
-    """
-    Generate word-by-word timestamps for captions
-    This is a simple estimation - for precise timing, use speech recognition
-    """
-    
-    words = script.split()
-    
-    # Average speaking rate: 2.5 words per second
-    words_per_second = 2.5
+def timestamps_from_boundaries(boundaries: List[Dict[str, Any]]) -> list:
+    """Word-by-word timestamps from edge-tts WordBoundary events"""
     
     timestamps = []
-    current_time = 0.0
     
-    for word in words:
-        # Clean word
-        clean_word = re.sub(r'[^\w\s]', '', word)
-        
-        if not clean_word:
+    for event in boundaries:
+        word = event["text"].strip(".,!?;:\"'()…")
+        if not word:
             continue
         
-        # Estimate duration based on word length
-        # Longer words take more time
-        char_count = len(clean_word)
-        base_duration = 1.0 / words_per_second
-        duration = base_duration * (0.7 + 0.3 * (char_count / 7))
-        
-        # Add pause after punctuation
-        if any(p in word for p in [',', '.', '!', '?', '...', ':']):
-            duration += 0.2
-        
-        end_time = current_time + duration
-        
+        start = event["offset"] / TICKS_PER_SECOND
         timestamps.append({
-            "start": round(current_time, 2),
-            "end": round(end_time, 2),
-            "word": clean_word
+            "start": round(start, 2),
+            "end": round(start + event["duration"] / TICKS_PER_SECOND, 2),
+            "word": word
         })
-        
-        current_time = end_time
     
     return timestamps
 
 
+def generate_timestamps(script: str) -> list:
+    """
+    Generate word-by-word timestamps for captions
+    Estimated from word length, for when edge-tts sends no WordBoundary events
+    """
+    
+    # Clean words; tokens that are only punctuation get no caption or time
+    words = [
+        (word, clean_word)
+        for word in script.split()
+        if (clean_word := _PUNCT_RE.sub('', word))
+    ]
+    
+    if not words:
+        return []
+    
+    # Average speaking rate: 2.5 words per second
+    words_per_second = 2.5
+    base_duration = 1.0 / words_per_second
+    
+    # Estimate duration based on word length
+    # Longer words take more time
+    char_counts = np.fromiter((len(clean) for _, clean in words), dtype=float, count=len(words))
+    durations = base_duration * (0.7 + 0.3 * (char_counts / 7))
+    
+    # Add pause after punctuation
+    pauses = np.fromiter(
+        (any(p in word for p in ",.!?:") for word, _ in words),
+        dtype=bool, count=len(words)
+    )
+    durations += 0.2 * pauses
+    
+    # Each word starts where the previous one ended
+    ends = np.cumsum(durations)
+    starts = np.concatenate(([0.0], ends[:-1]))
+    
+    return [
+        {"start": start, "end": end, "word": clean}
+        for start, end, (_, clean) in zip(
+            np.round(starts, 2).tolist(), np.round(ends, 2).tolist(), words
+        )
+    ]
+
+
 def save_timestamps(timestamps: list):
     """Save timestamps to file in original format"""
     
@@ -307,22 +476,10 @@ def save_timestamps(timestamps: list):
     
     timestamp_path = output_dir / "timestamps.txt"
     
-    with open(timestamp_path, 'w', encoding='utf-8') as f:
-        for ts in timestamps:
-            f.write(f"{ts['start']}|{ts['end']}|{ts['word']}\n")
+    # One write; same start|end|word lines as ReelRun's whisper_gen
+    timestamp_path.write_text(
+        "".join(f"{ts['start']:.2f}|{ts['end']:.2f}|{ts['word']}\n" for ts in timestamps),
+        encoding="utf-8"
+    )
     
     print(f"✅ Timestamps saved: {timestamp_path}")
-
-
-async def get_audio_duration(audio_path: Path) -> Optional[float]:
-    """Get duration of audio file"""
-    
-    try:
-        from moviepy.editor import AudioFileClip
-        audio = AudioFileClip(str(audio_path))
-        duration = audio.duration
-        audio.close()
-        return duration
-    except:
-        return None
-
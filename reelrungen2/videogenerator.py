@@ -1,15 +1,27 @@
 """
-Video Generator using OpenRouter image generation + MoviePy conversion
+Video Generator using OpenRouter image generation + ffmpeg conversion
 """
 
-import base64
+import asyncio
+import binascii
+import hashlib
 import os
-import uuid
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, Union
 
+import aiofiles
 import aiohttp
+import orjson
 from dotenv import load_dotenv
+from tenacity import (
+    retry, retry_if_exception, stop_after_attempt, wait_exponential, wait_random
+)
+
+try:
+    from moviepy.config import get_setting
+except ImportError:
+    print("⚠️  Install required packages: pip install moviepy --break-system-packages")
+    raise
 
 load_dotenv()
 
@@ -18,6 +30,15 @@ OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 if not OPENROUTER_API_KEY:
     raise ValueError("Set OPENROUTER_API_KEY environment variable")
 
+# Generated images go straight into ffmpeg; set KEEP_GENERATED_IMAGES=1
+# to also keep them in output/images for debugging or re-encoding
+KEEP_IMAGES = os.getenv("KEEP_GENERATED_IMAGES") == "1"
+
+
+# Part of every cached file name; bump it when image_to_video's output
+# changes, so videos encoded by an older version are not reused
+CACHE_VERSION = 2
+
 
 # Image generation models available on OpenRouter
 IMAGE_MODELS = {
@@ -27,6 +48,57 @@ IMAGE_MODELS = {
 }
 
 
+# Shared by every request in the run, so the OpenRouter and image host
+# connections, with their TLS sessions, stay open between calls
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Create the shared session lazily, inside the running event loop"""
+
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60, ttl_dns_cache=300)
+        )
+    return _SESSION
+
+
+async def close_session():
+    """Close the shared session; call once before the event loop ends"""
+
+    global _SESSION
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+
+
+# A stalled provider fails the attempt instead of hanging the pipeline
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=10)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Rate limits, server errors, dropped connections and timeouts are worth retrying"""
+
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRY_STATUSES
+    return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+_backoff = wait_exponential(multiplier=1, max=30) + wait_random(0, 1)
+
+
+def _wait(retry_state) -> float:
+    """Wait as long as a 429 asks to, otherwise back off exponentially"""
+
+    exc = retry_state.outcome.exception()
+    retry_after = getattr(exc, "headers", None) and exc.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), 60)
+    return _backoff(retry_state)
+
+
 async def generate_video(
     prompt: str,
     duration: int = 30,
@@ -51,77 +123,146 @@ async def generate_video(
 
     model_name = IMAGE_MODELS.get(model, IMAGE_MODELS["flux"])
 
+    # Named after the request, so a repeat reel reuses the video (or a
+    # kept image) on disk instead of paying for another generation and encode
+    request_id = hashlib.sha256(
+        f"{CACHE_VERSION}|{model_name}|{duration}|{style}|{prompt}".encode("utf-8")
+    ).hexdigest()[:16]
+    image_path = Path("output/images") / f"{request_id}.png"
+    video_path = Path("output/videos") / f"{request_id}.mp4"
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "http://localhost",
-                    "X-Title": "Instagram Reel Generator"
-                },
-                json={
-                    "model": model_name,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": enhanced_prompt
-                        }
-                    ],
-                    "modalities": ["image"],
-                    "image_config": {
-                        "aspect_ratio": "9:16",
-                        "image_size": "1K"
-                    },
-                    "stream": False
-                }
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    print(f"API Error ({response.status}): {error_text[:500]}")
+        if video_path.exists():
+            print(f"Reusing cached video: {video_path}")
+        else:
+            image: Union[Path, bytes]
+            if image_path.exists():
+                print(f"Reusing cached image: {image_path}")
+                image = image_path
+            else:
+                try:
+                    image = await _request_image(enhanced_prompt, model_name)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # Out of retries; a plain background keeps the reel going
+                    print(f"Image generation failed after retries: {e!r}")
+                    return await use_fallback_video()
+                if not image:
                     return None
+                if KEEP_IMAGES:
+                    await keep_image(image, image_path)
 
-                result = await response.json()
+            if not await image_to_video(image, duration, request_id):
+                print("Failed to convert image to video")
+                return None
 
-                image_payload = extract_image_payload(result)
-                if not image_payload:
-                    print("No image payload returned")
-                    return None
+        return {
+            "video_path": str(video_path),
+            "video_id": request_id,
+            "image_path": str(image_path) if image_path.exists() else None,
+            "prompt": prompt,
+            "model": model
+        }
 
-                request_id = str(result.get("id") or uuid.uuid4())
-                image_path = await save_generated_image(session, image_payload, request_id)
-                if not image_path:
-                    print("Failed to save generated image")
-                    return None
+    except Exception as e:
+        print(f"Error generating video: {e}")
+        return None
 
-                video_path = image_to_video(image_path, duration, request_id)
-                if not video_path:
-                    print("Failed to convert image to video")
-                    return None
 
-                return {
-                    "video_path": str(video_path),
-                    "video_id": request_id,
-                    "image_path": str(image_path),
-                    "prompt": prompt,
-                    "model": model
-                }
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=_wait,
+    stop=stop_after_attempt(4),
+    reraise=True
+)
+async def _request_image(prompt: str, model_name: str) -> Optional[bytes]:
+    """
+    Generate one image on OpenRouter and return its encoded bytes.
 
-    except Exception as e:
-        print(f"Error generating video: {e}")
+    Retryable failures raise, and are retried up to four attempts in all;
+    anything else is printed and returns None.
+    """
+
+    session = await _get_session()
+    async with session.post(
+        "https://openrouter.ai/api/v1/chat/completions",
+        headers={
+            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "http://localhost",
+            "X-Title": "Instagram Reel Generator"
+        },
+        json={
+            "model": model_name,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "modalities": ["image"],
+            "image_config": {
+                "aspect_ratio": "9:16",
+                "image_size": "1K"
+            },
+            "stream": False
+        },
+        timeout=REQUEST_TIMEOUT
+    ) as response:
+        if not response.ok:
+            # Only the start of the body, for the log: error pages can be
+            # tens of KB of HTML. Read before raise_for_status releases it.
+            snippet = (await response.content.read(2048)).decode("utf-8", "replace")
+            print(f"API Error ({response.status}): {snippet}")
+            if response.status not in RETRY_STATUSES:
+                return None
+        response.raise_for_status()
+
+        # A base64 image makes this body megabytes long; orjson parses it
+        # several times faster than the stdlib json behind response.json()
+        result = orjson.loads(await response.read())
+
+    image_payload = extract_image_payload(result)
+    if not image_payload:
+        print("No image payload returned")
         return None
 
+    image = await fetch_image_bytes(session, image_payload)
+    if not image:
+        print("Failed to fetch generated image")
+    return image
+
+
+# Where OpenRouter puts the image in almost every response
+_FAST_PATH = ("choices", 0, "message", "images", 0, "image_url", "url")
+
+
+def _walk(obj: Any, path: Tuple) -> Any:
+    """Follow dict keys and list indexes into a JSON value, None on any miss."""
+
+    for key in path:
+        if isinstance(key, str):
+            obj = obj.get(key) if isinstance(obj, dict) else None
+        else:
+            obj = obj[key] if isinstance(obj, list) and key < len(obj) else None
+        if obj is None:
+            return None
+    return obj
+
 
 def extract_image_payload(result: Dict[str, Any]) -> Optional[Tuple[str, str]]:
     """Return (payload_type, payload_value). payload_type is 'url' or 'b64'."""
 
+    # Common case first, without walking every other known shape
+    url = _walk(result, _FAST_PATH)
+    if isinstance(url, str) and url:
+        return ("b64", url) if url.startswith("data:image") else ("url", url)
+
     # OpenRouter chat/completions image responses
     choices = result.get("choices")
     if isinstance(choices, list) and choices:
         message = (choices[0] or {}).get("message", {})
 
-        # Most common path: message.images[0].image_url.url
+        # message.images[0] variants the fast path misses: imageUrl, url, b64_json
         images = message.get("images")
         if isinstance(images, list) and images:
             first = images[0] or {}
@@ -176,18 +317,13 @@ def extract_image_payload(result: Dict[str, Any]) -> Optional[Tuple[str, str]]:
     return None
 
 
-async def save_generated_image(
+async def fetch_image_bytes(
     session: aiohttp.ClientSession,
-    image_payload: Tuple[str, str],
-    request_id: str
-) -> Optional[Path]:
-    """Save generated image from URL or base64 payload."""
-
-    output_dir = Path("output/images")
-    output_dir.mkdir(parents=True, exist_ok=True)
+    image_payload: Tuple[str, str]
+) -> Optional[bytes]:
+    """Return the encoded image from a URL or base64 payload."""
 
     payload_type, payload_value = image_payload
-    image_path = output_dir / f"{request_id}.png"
 
     try:
         if payload_type == "url":
@@ -195,56 +331,78 @@ async def save_generated_image(
                 if response.status != 200:
                     print(f"Image download failed: {response.status}")
                     return None
-                image_path.write_bytes(await response.read())
-                return image_path
+                return await response.read()
 
         if payload_type == "b64":
-            raw = payload_value
-            if raw.startswith("data:image") and "," in raw:
-                raw = raw.split(",", 1)[1]
-            image_path.write_bytes(base64.b64decode(raw))
-            return image_path
+            # One ASCII copy of the payload; a data URL prefix is skipped
+            # with a memoryview instead of split() copying it all again
+            data = payload_value.encode("ascii")
+            start = data.find(b",") + 1 if data.startswith(b"data:image") else 0
+            return binascii.a2b_base64(memoryview(data)[start:])
 
     except Exception as e:
-        print(f"Image save error: {e}")
+        print(f"Image fetch error: {e}")
 
     return None
 
 
-def image_to_video(image_path: Path, duration: int, video_id: str) -> Optional[Path]:
-    """Convert a single image into a 9:16 mp4 video."""
+async def keep_image(image: bytes, image_path: Path) -> None:
+    """Write a generated image to disk, where generate_video can reuse it."""
 
-    try:
-        from PIL import Image
-        if not hasattr(Image, "ANTIALIAS") and hasattr(Image, "Resampling"):
-            Image.ANTIALIAS = Image.Resampling.LANCZOS
+    image_path.parent.mkdir(parents=True, exist_ok=True)
+    # Written under a temporary name, so a broken write is never
+    # mistaken for a cached image
+    part_path = image_path.with_suffix(".part")
+    async with aiofiles.open(part_path, "wb") as f:
+        await f.write(image)
+    part_path.replace(image_path)
+
+
+async def image_to_video(
+    image: Union[Path, bytes],
+    duration: int,
+    video_id: str
+) -> Optional[Path]:
+    """
+    Convert a single image into a 9:16 mp4 video.
 
-        from moviepy.editor import ImageClip
+    The image is a file on disk, or encoded bytes that are piped to
+    ffmpeg's stdin without touching the disk.
+    """
 
+    try:
         output_dir = Path("output/videos")
         output_dir.mkdir(parents=True, exist_ok=True)
         video_path = output_dir / f"{video_id}.mp4"
-
-        clip = ImageClip(str(image_path)).set_duration(duration)
-        final_clip = clip.resize(height=1280)
-
-        if final_clip.w > 720:
-            final_clip = final_clip.crop(x_center=final_clip.w / 2, width=720, height=1280)
-        elif final_clip.w < 720:
-            padding = int((720 - final_clip.w) // 2)
-            final_clip = final_clip.margin(left=padding, right=padding, color=(0, 0, 0))
-
-        final_clip.write_videofile(
-            str(video_path),
-            fps=24,
-            codec="libx264",
-            audio=False,
-            verbose=False,
-            logger=None
+        # Renamed into place once complete, like the cached images
+        part_path = video_path.with_suffix(".part.mp4")
+
+        # One ffmpeg pass: fit to 1280 high, crop to 720 wide if wider,
+        # pad with black if narrower, and encode the still with x264.
+        # The image is decoded once and repeated by the loop filter, not
+        # by -loop 1, which cannot rewind a pipe longer than its buffer.
+        # At 1 fps the filters run once a second and fps=24 only repeats
+        # the finished frame; with one keyframe per 10 s every repeat is
+        # a skipped P-frame.
+        piped = isinstance(image, bytes)
+        source = ["-f", "image2pipe", "-i", "pipe:0"] if piped else ["-i", str(image)]
+
+        proc = await asyncio.create_subprocess_exec(
+            get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+            "-framerate", "1", *source,
+            "-t", str(duration),
+            "-vf", "loop=loop=-1:size=1,scale=-2:1280,crop='min(iw,720)':1280,"
+                   "pad=720:1280:(ow-iw)/2:0:black,setsar=1,fps=24",
+            "-c:v", "libx264", "-tune", "stillimage", "-preset", "veryfast",
+            "-g", "240", "-keyint_min", "240", "-sc_threshold", "0",
+            "-pix_fmt", "yuv420p", "-an",
+            str(part_path),
+            stdin=asyncio.subprocess.PIPE if piped else asyncio.subprocess.DEVNULL
         )
-
-        clip.close()
-        final_clip.close()
+        await proc.communicate(image if piped else None)
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {proc.returncode}")
+        part_path.replace(video_path)
 
         print(f"Image converted to video: {video_path}")
         return video_path
@@ -255,30 +413,36 @@ def image_to_video(image_path: Path, duration: int, video_id: str) -> Optional[P
 
 
 # Fallback: Use static video if API unavailable
-def use_fallback_video() -> Optional[Dict[str, Any]]:
+async def use_fallback_video() -> Optional[Dict[str, Any]]:
     """Use a fallback video if AI generation fails"""
 
     print("Using fallback video generation...")
 
     try:
-        from moviepy.editor import ColorClip
-
         output_dir = Path("output/videos")
         output_dir.mkdir(parents=True, exist_ok=True)
 
         video_path = output_dir / "fallback.mp4"
 
-        clip = ColorClip(
-            size=(720, 1280),
-            color=(20, 20, 40),
-            duration=30
-        )
-
-        clip.write_videofile(
-            str(video_path),
-            fps=24,
-            codec="libx264"
-        )
+        # Always the same clip, so it is rendered once and reused
+        if video_path.exists():
+            print(f"Reusing fallback video: {video_path}")
+        else:
+            part_path = video_path.with_suffix(".part.mp4")
+
+            # A solid 720x1280 colour straight from ffmpeg's lavfi source
+            proc = await asyncio.create_subprocess_exec(
+                get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", "color=c=0x141428:s=720x1280:r=24:d=30",
+                "-c:v", "libx264", "-tune", "stillimage", "-preset", "veryfast",
+                "-g", "240", "-pix_fmt", "yuv420p",
+                str(part_path),
+                stdin=asyncio.subprocess.DEVNULL
+            )
+            await proc.wait()
+            if proc.returncode != 0:
+                raise RuntimeError(f"ffmpeg exited with code {proc.returncode}")
+            part_path.replace(video_path)
 
         return {
             "video_path": str(video_path),